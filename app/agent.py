@@ -5,18 +5,25 @@ Agent for structured data extraction from medical notes.
 
 Pipeline:
 1. Use LLM to extract structured fields (patient, conditions, meds, vitals, labs, plan)
-   in a strict JSON format.
+   in a strict JSON format (optionally together with a note summary).
 2. Enrich conditions with ICD-10 codes.
 3. Enrich medications with RxNorm codes.
 """
 
+import functools
 import json
+from concurrent.futures import Future, ThreadPoolExecutor
 from typing import Dict, Any, Optional, Tuple
 
+import ijson
 import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from openai import OpenAI
 
 from .config import settings
+from . import llm_cache
+from .llm_client import prompt_cache_params
 from .schemas import StructuredNote, Condition, Medication
 
 
@@ -29,35 +36,99 @@ client = OpenAI(
 
 # ---------- Helpers: external code lookup (public APIs) ----------
 
+# Shared HTTP session so lookups reuse keep-alive connections instead of
+# paying a TCP + TLS handshake per condition/medication.
+_http = requests.Session()
+_http.headers.update({"User-Agent": "ai-medical-backend/0.3.0"})
+_http.mount(
+    "https://",
+    HTTPAdapter(
+        pool_connections=32,
+        pool_maxsize=32,
+        max_retries=Retry(
+            total=3,
+            backoff_factor=0.2,
+            status_forcelist=[429, 500, 502, 503, 504],
+        ),
+    ),
+)
+
+
+@functools.lru_cache(maxsize=4096)
+def _lookup_icd10_cached(name_norm: str) -> Optional[str]:
+    """
+    Raw NLM clinicaltables HTTP query, memoized by the LRU cache around it.
+    HTTP/parse errors propagate so that transient failures are not cached.
+    """
+    resp = _http.get(
+        "https://clinicaltables.nlm.nih.gov/api/icd10cm/v3/search",
+        params={
+            "sf": "code,name",
+            "terms": name_norm,
+            "maxList": 1,
+        },
+        timeout=5,
+    )
+    resp.raise_for_status()
+    data = resp.json()
+    # data[3] is list of [code, name] pairs
+    results = data[3]
+    if results:
+        return results[0][0]
+    return None
+
+
+@functools.lru_cache(maxsize=4096)
+def _lookup_rxnorm_cached(name_norm: str) -> Optional[str]:
+    """
+    Raw RxNav HTTP query, memoized by the LRU cache around it; errors
+    propagate (see _lookup_icd10_cached).
+    """
+    resp = _http.get(
+        "https://rxnav.nlm.nih.gov/REST/rxcui.json",
+        params={"name": name_norm},
+        timeout=5,
+    )
+    resp.raise_for_status()
+    data = resp.json()
+    id_group = data.get("idGroup", {})
+    rxcui = id_group.get("rxnormId")
+    if rxcui and len(rxcui) > 0:
+        return rxcui[0]
+    return None
+
+
+# Placeholder names the LLM emits for empty fields; looking them up only
+# burns a request against the NLM rate limit.
+_JUNK_NAMES = {"", "n/a", "na", "none", "nil", "null", "unknown", "see above", "not specified"}
+
+
+def _is_junk_name(name_norm: str) -> bool:
+    return (
+        name_norm in _JUNK_NAMES
+        or len(name_norm) < 3
+        or not any(c.isalpha() for c in name_norm)
+    )
+
+
 def lookup_icd10(condition_name: str) -> Optional[str]:
     """
     Best-effort ICD-10 lookup using the NLM clinicaltables API.
 
     Docs: https://clinicaltables.nlm.nih.gov/apidoc/icd10cm/v3/doc.html
 
+    Results are cached per process on the normalized name.
     If the API fails or no result, returns None.
     """
+    name_norm = condition_name.strip().lower()
+    if _is_junk_name(name_norm):
+        return None
+
     try:
-        resp = requests.get(
-            "https://clinicaltables.nlm.nih.gov/api/icd10cm/v3/search",
-            params={
-                "sf": "code,name",
-                "terms": condition_name,
-                "maxList": 1,
-            },
-            timeout=5,
-        )
-        resp.raise_for_status()
-        data = resp.json()
-        # data[3] is list of [code, name] pairs
-        results = data[3]
-        if results:
-            code = results[0][0]
-            return code
+        return _lookup_icd10_cached(name_norm)
     except Exception:
         # Fail silently and return None
         return None
-    return None
 
 
 def lookup_rxnorm(med_name: str) -> Optional[str]:
@@ -66,105 +137,358 @@ def lookup_rxnorm(med_name: str) -> Optional[str]:
 
     Docs: https://rxnav.nlm.nih.gov/REST/rxcui.html
 
+    Results are cached per process on the normalized name.
     If the API fails or no result, returns None.
     """
+    name_norm = med_name.strip().lower()
+    if _is_junk_name(name_norm):
+        return None
+
     try:
-        resp = requests.get(
-            "https://rxnav.nlm.nih.gov/REST/rxcui.json",
-            params={"name": med_name},
-            timeout=5,
-        )
-        resp.raise_for_status()
-        data = resp.json()
-        id_group = data.get("idGroup", {})
-        rxcui = id_group.get("rxnormId")
-        if rxcui and len(rxcui) > 0:
-            return rxcui[0]
+        return _lookup_rxnorm_cached(name_norm)
     except Exception:
         return None
-    return None
 
 
-# ---------- Core Agent Logic ----------
+# Shared pool for code lookups (I/O-bound HTTP calls)
+_lookup_executor = ThreadPoolExecutor(max_workers=16, thread_name_prefix="code-lookup")
+
 
-def _call_llm_for_structure(note: str) -> Tuple[Dict[str, Any], Any]:
+class _CodeLookups:
+    """
+    In-flight ICD-10 / RxNorm lookups for one note, one future per distinct
+    name. Lets lookups start while the LLM reply is still streaming and be
+    picked up later by _enrich_with_codes without duplicate requests.
     """
-    Calls the LLM to turn a raw note into structured JSON matching StructuredNote.
 
-    Returns a Python dict (not a Pydantic model yet).
+    def __init__(self) -> None:
+        self._icd10: Dict[str, Future] = {}
+        self._rxnorm: Dict[str, Future] = {}
+
+    @staticmethod
+    def _submit(lookup, name: str) -> Future:
+        if _is_junk_name(name.strip().lower()):
+            # Resolve placeholders here instead of queueing them on the pool
+            future: Future = Future()
+            future.set_result(None)
+            return future
+        return _lookup_executor.submit(lookup, name)
+
+    def icd10(self, name: str) -> Future:
+        if name not in self._icd10:
+            self._icd10[name] = self._submit(lookup_icd10, name)
+        return self._icd10[name]
+
+    def rxnorm(self, name: str) -> Future:
+        if name not in self._rxnorm:
+            self._rxnorm[name] = self._submit(lookup_rxnorm, name)
+        return self._rxnorm[name]
+
+
+# ---------- Core Agent Logic ----------
+
+# JSON layout shared by the extraction-only and summarize+extract prompts.
+_STRUCTURE_FIELDS = (
+    '  "patient": {\n'
+    '    "name": string or null,\n'
+    '    "age": integer or null,\n'
+    '    "sex": "male" | "female" | "other" | "unknown" or null\n'
+    "  },\n"
+    '  "conditions": [ {"name": string} ],\n'
+    '  "medications": [ {"name": string, "dose": string or null, "route": string or null, "frequency": string or null} ],\n'
+    '  "vitals": [ {"type": string, "value": string, "unit": string or null} ],\n'
+    '  "labs": [ {"name": string, "value": string, "unit": string or null} ],\n'
+    '  "plan": [ {"description": string} ]\n'
+)
+
+_SYSTEM_PROMPT_EXTRACT = (
+    "You are an assistant that extracts structured data from clinical notes. "
+    "You MUST respond with valid JSON ONLY, with this exact structure:\n\n"
+    "{\n"
+    + _STRUCTURE_FIELDS
+    + "}\n\n"
+    "If some sections are not present in the note, return empty lists or nulls for those fields. "
+    "Do NOT include any extra keys or comments."
+)
+
+_SYSTEM_PROMPT_SUMMARIZE_AND_EXTRACT = (
+    "You are a clinical documentation assistant that both summarizes clinical notes "
+    "and extracts structured data from them. "
+    "You MUST respond with valid JSON ONLY, with this exact structure:\n\n"
+    "{\n"
+    '  "summary": string,\n'
+    + _STRUCTURE_FIELDS
+    + "}\n\n"
+    "The summary is 3–5 concise bullet points, one per line, focusing on chief complaint, "
+    "key history, exam findings, and plan. "
+    "If some sections are not present in the note, return empty lists or nulls for those fields. "
+    "Do NOT include any extra keys or comments."
+)
+
+
+# JSON schemas for OpenAI structured outputs (strict mode: every property is
+# required and nullable fields use a "null" type instead of being omitted).
+def _object_schema(properties: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "type": "object",
+        "properties": properties,
+        "required": list(properties),
+        "additionalProperties": False,
+    }
+
+
+def _list_schema(properties: Dict[str, Any]) -> Dict[str, Any]:
+    return {"type": "array", "items": _object_schema(properties)}
+
+
+def _response_format(name: str, properties: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "type": "json_schema",
+        "json_schema": {
+            "name": name,
+            "strict": True,
+            "schema": _object_schema(properties),
+        },
+    }
+
+
+_STRING = {"type": "string"}
+_NULLABLE_STRING = {"type": ["string", "null"]}
+
+_STRUCTURE_PROPERTIES = {
+    "patient": {
+        "anyOf": [
+            _object_schema({
+                "name": _NULLABLE_STRING,
+                "age": {"type": ["integer", "null"]},
+                "sex": {"type": ["string", "null"], "enum": ["male", "female", "other", "unknown", None]},
+            }),
+            {"type": "null"},
+        ]
+    },
+    "conditions": _list_schema({"name": _STRING}),
+    "medications": _list_schema({
+        "name": _STRING,
+        "dose": _NULLABLE_STRING,
+        "route": _NULLABLE_STRING,
+        "frequency": _NULLABLE_STRING,
+    }),
+    "vitals": _list_schema({"type": _STRING, "value": _STRING, "unit": _NULLABLE_STRING}),
+    "labs": _list_schema({"name": _STRING, "value": _NULLABLE_STRING, "unit": _NULLABLE_STRING}),
+    "plan": _list_schema({"description": _STRING}),
+}
+
+_RESPONSE_FORMAT_EXTRACT = _response_format("StructuredNote", _STRUCTURE_PROPERTIES)
+_RESPONSE_FORMAT_SUMMARIZE_AND_EXTRACT = _response_format(
+    "SummaryAndStructuredNote",
+    {"summary": _STRING, **_STRUCTURE_PROPERTIES},
+)
+
+
+def _chat_request(
+    system_prompt: str,
+    response_format: Dict[str, Any],
+    note: str,
+    cache_key: str,
+) -> Dict[str, Any]:
     """
-    system_prompt = (
-        "You are an assistant that extracts structured data from clinical notes. "
-        "You MUST respond with valid JSON ONLY, with this exact structure:\n\n"
-        "{\n"
-        '  "patient": {\n'
-        '    "name": string or null,\n'
-        '    "age": integer or null,\n'
-        '    "sex": string or null\n'
-        "  },\n"
-        '  "conditions": [ {"name": string} ],\n'
-        '  "medications": [ {"name": string, "dose": string or null, "route": string or null, "frequency": string or null} ],\n'
-        '  "vitals": [ {"type": string, "value": string, "unit": string or null} ],\n'
-        '  "labs": [ {"name": string, "value": string, "unit": string or null} ],\n'
-        '  "plan": [ {"description": string} ]\n'
-        "}\n\n"
-        "If some sections are not present in the note, return empty lists or nulls for those fields. "
-        "Do NOT include any extra keys or comments."
-    )
+    Chat completion parameters for running `system_prompt` on a raw note,
+    constrained to the JSON schema in `response_format`.
 
+    `cache_key` names the static prompt prefix for server-side prompt caching.
+    """
     user_prompt = f"Clinical note:\n\n{note}\n\nExtract the structured data now."
 
-    response = client.chat.completions.create(
-        model=settings.LLM_MODEL,
-        messages=[
+    return {
+        "model": settings.LLM_MODEL,
+        "messages": [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt},
         ],
-        temperature=0.1,
-    )
+        "response_format": response_format,
+        "temperature": 0.1,
+        **prompt_cache_params(cache_key),
+    }
 
-    raw = response.choices[0].message.content.strip()
 
-    # The model might wrap JSON in ```json ... ```; strip that if present.
-    if raw.startswith("```"):
-        raw = raw.strip("`")
-        # remove leading 'json\n' if present
-        if raw.lower().startswith("json"):
-            raw = raw[4:].lstrip()
+# LLM cache kinds, tied to the exact request templates above
+_CACHE_KIND_EXTRACT = llm_cache.prompt_kind(
+    "extract_structured",
+    _chat_request(_SYSTEM_PROMPT_EXTRACT, _RESPONSE_FORMAT_EXTRACT, "{note}", "extract_structured_v1"),
+)
+_CACHE_KIND_SUMMARIZE_AND_EXTRACT = llm_cache.prompt_kind(
+    "summarize_and_extract",
+    _chat_request(
+        _SYSTEM_PROMPT_SUMMARIZE_AND_EXTRACT,
+        _RESPONSE_FORMAT_SUMMARIZE_AND_EXTRACT,
+        "{note}",
+        "summarize_and_extract_v1",
+    ),
+)
+
+
+def _check_json_reply(content: str) -> Tuple[Dict[str, Any], str]:
+    """
+    Parse a structured-output reply as JSON.
+
+    The API guarantees schema-valid JSON, so a failure here means a refusal,
+    a truncated reply or a provider bug rather than formatting drift.
+
+    Returns the parsed dict and the stripped reply text (what gets cached).
+    """
+    raw = (content or "").strip()
 
     try:
         data = json.loads(raw)
     except json.JSONDecodeError as e:
-        # For robustness, wrap in a basic structure if parsing fails
-        # In a real system, you'd retry or log this.
         raise RuntimeError(f"Failed to parse LLM JSON: {e}\nRaw content:\n{raw}")
 
-    return data, response.usage
+    return data, raw
+
+
+def _request_json(
+    system_prompt: str,
+    response_format: Dict[str, Any],
+    note: str,
+    cache_key: str,
+    lookups: _CodeLookups,
+) -> Tuple[Dict[str, Any], str, Any]:
+    """
+    Calls the LLM with `system_prompt` on a raw note and expects a JSON reply.
+
+    The reply is streamed through an incremental JSON parser, and code
+    lookups for conditions/medications start on `lookups` as soon as their
+    names have been decoded, overlapping the HTTP calls with the rest of
+    the generation.
+
+    Returns the parsed reply, its JSON text (for the LLM cache) and the
+    token usage.
+    """
+    stream = client.chat.completions.create(
+        **_chat_request(system_prompt, response_format, note, cache_key),
+        stream=True,
+        stream_options={"include_usage": True},
+    )
+
+    events = ijson.sendable_list()
+    parser = ijson.parse_coro(events)
+    parts = []
+    usage = None
+
+    for chunk in stream:
+        if chunk.usage:
+            usage = chunk.usage
+        if not chunk.choices or not chunk.choices[0].delta.content:
+            continue
+
+        delta = chunk.choices[0].delta.content
+        parts.append(delta)
+        if parser is None:
+            continue
+
+        try:
+            parser.send(delta.encode("utf-8"))
+        except ijson.JSONError:
+            # Leave it to _check_json_reply to report on the full reply
+            parser = None
+            continue
+
+        for prefix, event, value in events:
+            if event != "string" or not value:
+                continue
+            if prefix == "conditions.item.name":
+                lookups.icd10(value)
+            elif prefix == "medications.item.name":
+                lookups.rxnorm(value)
+        del events[:]
+
+    data, raw = _check_json_reply("".join(parts))
+    return data, raw, usage
+
+
+def extraction_request_body(note: str) -> Dict[str, Any]:
+    """
+    Chat completion body for structured extraction of `note`, as submitted
+    through the OpenAI Batch API (see app/batch.py).
+    """
+    body = _chat_request(_SYSTEM_PROMPT_EXTRACT, _RESPONSE_FORMAT_EXTRACT, note, "extract_structured_v1")
+    # The SDK's extra_body is merged into the request; here we are the request
+    body.update(body.pop("extra_body", {}))
+    return body
+
+
+def structured_from_reply(content: str) -> StructuredNote:
+    """
+    Turn a raw extraction reply (e.g. from a Batch API output file) into an
+    enriched StructuredNote.
+    """
+    struct_dict, _ = _check_json_reply(content)
+    struct_dict = _enrich_with_codes(struct_dict)
+    return StructuredNote.model_validate(struct_dict)
+
+
+def _call_llm_for_structure(
+    note: str,
+    lookups: _CodeLookups,
+) -> Tuple[Dict[str, Any], Any]:
+    """
+    Calls the LLM to turn a raw note into structured JSON matching StructuredNote,
+    served from the LLM cache when possible.
+
+    Returns a Python dict (not a Pydantic model yet).
+    """
+    return llm_cache.get_or_compute(
+        _CACHE_KIND_EXTRACT,
+        note,
+        lambda: _request_json(
+            _SYSTEM_PROMPT_EXTRACT,
+            _RESPONSE_FORMAT_EXTRACT,
+            note,
+            "extract_structured_v1",
+            lookups,
+        ),
+        decode=json.loads,
+    )
 
 
-def _enrich_with_codes(struct_dict: Dict[str, Any]) -> Dict[str, Any]:
+def _enrich_with_codes(
+    struct_dict: Dict[str, Any],
+    lookups: Optional[_CodeLookups] = None,
+) -> Dict[str, Any]:
     """
     Takes the raw dict from the LLM and enriches conditions and medications
     with ICD-10 and RxNorm codes.
+
+    Lookups are I/O-bound HTTP calls, so they are fanned out on a thread pool
+    and each distinct name is only looked up once. Lookups already started
+    on `lookups` (while streaming the LLM reply) are reused.
     """
-    # Enrich conditions
     conditions = struct_dict.get("conditions") or []
+    meds = struct_dict.get("medications") or []
+
+    struct_dict["conditions"] = conditions
+    struct_dict["medications"] = meds
+    if not conditions and not meds:
+        return struct_dict
+
+    lookups = lookups or _CodeLookups()
+
+    # Start every lookup before waiting on any of them
+    icd_futures = {c["name"]: lookups.icd10(c["name"]) for c in conditions if c.get("name")}
+    rx_futures = {m["name"]: lookups.rxnorm(m["name"]) for m in meds if m.get("name")}
+
+    # Enrich conditions
     for cond in conditions:
         name = cond.get("name")
         if name:
-            icd_code = lookup_icd10(name)
-            cond["icd10_code"] = icd_code
+            cond["icd10_code"] = icd_futures[name].result()
 
     # Enrich medications
-    meds = struct_dict.get("medications") or []
     for med in meds:
         name = med.get("name")
         if name:
-            rx_code = lookup_rxnorm(name)
-            med["rxnorm_code"] = rx_code
+            med["rxnorm_code"] = rx_futures[name].result()
 
-    struct_dict["conditions"] = conditions
-    struct_dict["medications"] = meds
     return struct_dict
 
 
@@ -172,9 +496,39 @@ def extract_structured_note(note: str) -> Tuple[StructuredNote, Any]:
     """
     Main entry point: given a raw text note, return a StructuredNote Pydantic model.
     """
-    struct_dict, usage = _call_llm_for_structure(note)
-    struct_dict = _enrich_with_codes(struct_dict)
+    lookups = _CodeLookups()
+    struct_dict, usage = _call_llm_for_structure(note, lookups)
+    struct_dict = _enrich_with_codes(struct_dict, lookups)
 
     # Use Pydantic to validate & coerce into the StructuredNote model
-    structured = StructuredNote(**struct_dict)
+    structured = StructuredNote.model_validate(struct_dict)
     return structured, usage
+
+
+def summarize_and_extract(note: str) -> Tuple[str, StructuredNote, Any]:
+    """
+    Summarize a note and extract its structured data in a single LLM call,
+    so the note tokens are only sent (and billed) once.
+
+    Returns (summary, StructuredNote, usage).
+    """
+    lookups = _CodeLookups()
+    struct_dict, usage = llm_cache.get_or_compute(
+        _CACHE_KIND_SUMMARIZE_AND_EXTRACT,
+        note,
+        lambda: _request_json(
+            _SYSTEM_PROMPT_SUMMARIZE_AND_EXTRACT,
+            _RESPONSE_FORMAT_SUMMARIZE_AND_EXTRACT,
+            note,
+            "summarize_and_extract_v1",
+            lookups,
+        ),
+        decode=json.loads,
+    )
+    summary = struct_dict.pop("summary", None) or ""
+    if isinstance(summary, list):
+        summary = "\n".join(str(line) for line in summary)
+
+    struct_dict = _enrich_with_codes(struct_dict, lookups)
+    structured = StructuredNote.model_validate(struct_dict)
+    return summary.strip(), structured, usage
@@ -0,0 +1,207 @@
+# app/batch.py
+
+"""
+Bulk structured extraction through the OpenAI Batch API.
+
+Batch requests are billed at half the synchronous price but can take up to
+24h to complete, so this path is meant for offline ingestion, not the UI.
+
+When BATCH_MODE is enabled:
+- /agent/extract_structured_async stores the note as a queued ExtractionJob.
+- A background worker submits all queued jobs as one batch every
+  BATCH_FLUSH_SECONDS, or sooner once BATCH_MAX_ITEMS jobs are waiting.
+  Jobs are claimed ("submitting") before the upload, so no job is sent in
+  two batches.
+- The same worker polls submitted batches and stores the enriched
+  StructuredNote (or an error) on each job, which callers poll by id.
+"""
+
+import json
+import logging
+import threading
+import uuid
+from typing import Dict, List, Optional
+
+from .config import settings
+from .db import SessionLocal
+from . import agent, models
+
+logger = logging.getLogger(__name__)
+
+_wake = threading.Event()
+_stop = threading.Event()
+_worker: Optional[threading.Thread] = None
+
+
+def enqueue(note: str) -> models.ExtractionJob:
+    """
+    Store a new queued extraction job for `note` and return it.
+    """
+    with SessionLocal() as db:
+        job = models.ExtractionJob(id=uuid.uuid4().hex, note=note, status="queued")
+        db.add(job)
+        db.commit()
+        db.refresh(job)
+
+        queued = db.query(models.ExtractionJob).filter(models.ExtractionJob.status == "queued").count()
+
+    if queued >= settings.BATCH_MAX_ITEMS:
+        _wake.set()
+    return job
+
+
+def get_job(job_id: str) -> Optional[models.ExtractionJob]:
+    with SessionLocal() as db:
+        return db.query(models.ExtractionJob).filter(models.ExtractionJob.id == job_id).first()
+
+
+def _claim_queued(db) -> List[models.ExtractionJob]:
+    """
+    Atomically move every queued job to "submitting" under a fresh claim id,
+    and return the claimed jobs.
+
+    The conditional UPDATE means each job is claimed by exactly one worker,
+    even with several processes flushing at once.
+    """
+    claim = f"claim-{uuid.uuid4().hex}"
+    db.query(models.ExtractionJob).filter(models.ExtractionJob.status == "queued").update(
+        {"status": "submitting", "batch_id": claim},
+        synchronize_session=False,
+    )
+    db.commit()
+    return db.query(models.ExtractionJob).filter(models.ExtractionJob.batch_id == claim).all()
+
+
+def _flush_queued() -> None:
+    """
+    Submit every queued job as a single Batch API request.
+    """
+    with SessionLocal() as db:
+        jobs = _claim_queued(db)
+        if not jobs:
+            return
+
+        try:
+            lines = [
+                json.dumps({
+                    "custom_id": job.id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": agent.extraction_request_body(job.note),
+                })
+                for job in jobs
+            ]
+            input_file = agent.client.files.create(
+                file=("extract_structured.jsonl", "\n".join(lines).encode("utf-8")),
+                purpose="batch",
+            )
+            batch = agent.client.batches.create(
+                input_file_id=input_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h",
+            )
+        except Exception:
+            # Nothing was submitted: release the claim so the next tick retries
+            for job in jobs:
+                job.status = "queued"
+                job.batch_id = None
+            db.commit()
+            raise
+
+        for job in jobs:
+            job.status = "submitted"
+            job.batch_id = batch.id
+        db.commit()
+
+
+def _read_results(file_id: Optional[str]) -> Dict[str, dict]:
+    """
+    Load a batch output/error file into {custom_id: record}.
+    """
+    if not file_id:
+        return {}
+    text = agent.client.files.content(file_id).text
+    records = [json.loads(line) for line in text.splitlines() if line.strip()]
+    return {rec["custom_id"]: rec for rec in records}
+
+
+def _complete_job(job: models.ExtractionJob, record: Optional[dict]) -> None:
+    try:
+        if record is None:
+            raise RuntimeError("No result returned for this job.")
+        if record.get("error"):
+            raise RuntimeError(str(record["error"]))
+
+        response = record["response"]
+        if response["status_code"] != 200:
+            raise RuntimeError(f"Batch request failed with status {response['status_code']}.")
+
+        content = response["body"]["choices"][0]["message"]["content"]
+        structured = agent.structured_from_reply(content)
+        job.result = structured.model_dump_json()
+        job.status = "completed"
+    except Exception as e:
+        job.status = "failed"
+        job.error = str(e)
+
+
+def _collect_results() -> None:
+    """
+    Poll submitted batches and store results for the ones that finished.
+    """
+    with SessionLocal() as db:
+        jobs: List[models.ExtractionJob] = (
+            db.query(models.ExtractionJob).filter(models.ExtractionJob.status == "submitted").all()
+        )
+        by_batch: Dict[str, List[models.ExtractionJob]] = {}
+        for job in jobs:
+            by_batch.setdefault(job.batch_id, []).append(job)
+
+        for batch_id, batch_jobs in by_batch.items():
+            batch = agent.client.batches.retrieve(batch_id)
+            if batch.status in {"validating", "in_progress", "finalizing", "cancelling"}:
+                continue
+
+            if batch.status == "completed":
+                records = _read_results(batch.error_file_id)
+                records.update(_read_results(batch.output_file_id))
+                for job in batch_jobs:
+                    _complete_job(job, records.get(job.id))
+            else:
+                # failed / expired / cancelled
+                for job in batch_jobs:
+                    job.status = "failed"
+                    job.error = f"Batch {batch_id} ended with status '{batch.status}'."
+
+            db.commit()
+
+
+def _run() -> None:
+    while not _stop.is_set():
+        try:
+            _flush_queued()
+            _collect_results()
+        except Exception:
+            # Keep the worker alive; the next tick retries.
+            logger.exception("Batch worker error")
+
+        _wake.wait(settings.BATCH_FLUSH_SECONDS)
+        _wake.clear()
+
+
+def start_worker() -> None:
+    """
+    Start the background batch worker (no-op if it is already running).
+    """
+    global _worker
+    if _worker is not None and _worker.is_alive():
+        return
+
+    _stop.clear()
+    _worker = threading.Thread(target=_run, name="batch-worker", daemon=True)
+    _worker.start()
+
+
+def stop_worker() -> None:
+    _stop.set()
+    _wake.set()
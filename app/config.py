@@ -1,15 +1,100 @@
 # app/config.py
-from pydantic import BaseSettings
+import os
+import re
+from dataclasses import dataclass, field
 
 
-class Settings(BaseSettings):
-    DATABASE_URL: str = "sqlite:///./app.db"
-    OPENAI_API_KEY: str | None = None
-    OPENAI_BASE_URL: str | None = None
-    LLM_MODEL: str = "gpt-4o-mini"
-    EMBEDDING_MODEL: str = "text-embedding-3-small"
+def _load_dotenv(path: str = ".env") -> None:
+    """
+    Minimal .env reader: KEY=VALUE lines, '#' comments (whole-line, or
+    after whitespace in unquoted values), optional quotes.
+    Variables already set in the environment take precedence.
+    """
+    try:
+        with open(path, encoding="utf-8") as f:
+            lines = f.readlines()
+    except FileNotFoundError:
+        return
 
-    class Config:
-        env_file = ".env"
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("#") or "=" not in line:
+            continue
+        key, _, value = line.removeprefix("export ").partition("=")
+        value = value.strip()
+        if value[:1] in ("\"", "'") and value.find(value[0], 1) != -1:
+            # Quoted: take what's inside, ignoring anything after the closing quote
+            value = value[1:value.find(value[0], 1)]
+        else:
+            value = re.split(r"\s+#", value, maxsplit=1)[0]
+        os.environ.setdefault(key.strip(), value)
 
+
+def _getenv(name: str) -> str | None:
+    """
+    Environment lookup that ignores the case of the variable name.
+    """
+    value = os.environ.get(name)
+    if value is not None:
+        return value
+
+    name = name.lower()
+    for key, value in os.environ.items():
+        if key.lower() == name:
+            return value
+    return None
+
+
+def _env_str(name: str, default: str | None = None) -> str | None:
+    value = _getenv(name)
+    return value if value else default
+
+
+# The spellings pydantic accepts for booleans
+_TRUE_VALUES = {"1", "on", "t", "true", "y", "yes"}
+_FALSE_VALUES = {"0", "off", "f", "false", "n", "no"}
+
+
+def _env_bool(name: str, default: bool) -> bool:
+    value = _getenv(name)
+    if not value:
+        return default
+    normalized = value.strip().lower()
+    if normalized in _TRUE_VALUES:
+        return True
+    if normalized in _FALSE_VALUES:
+        return False
+    raise ValueError(f"Invalid boolean for {name}: {value!r}")
+
+
+def _env_float(name: str, default: float | None) -> float | None:
+    value = _getenv(name)
+    return float(value) if value else default
+
+
+def _env_int(name: str, default: int) -> int:
+    value = _getenv(name)
+    return int(value) if value else default
+
+
+@dataclass(frozen=True, slots=True)
+class Settings:
+    DATABASE_URL: str = field(default_factory=lambda: _env_str("DATABASE_URL", "sqlite:///./app.db"))
+    OPENAI_API_KEY: str | None = field(default_factory=lambda: _env_str("OPENAI_API_KEY"), repr=False)
+    OPENAI_BASE_URL: str | None = field(default_factory=lambda: _env_str("OPENAI_BASE_URL"))
+    LLM_MODEL: str = field(default_factory=lambda: _env_str("LLM_MODEL", "gpt-4o-mini"))
+    EMBEDDING_MODEL: str = field(default_factory=lambda: _env_str("EMBEDDING_MODEL", "text-embedding-3-small"))
+    LLM_CACHE_ENABLED: bool = field(default_factory=lambda: _env_bool("LLM_CACHE_ENABLED", True))
+    LLM_CACHE_SEMANTIC_THRESHOLD: float | None = field(
+        default_factory=lambda: _env_float("LLM_CACHE_SEMANTIC_THRESHOLD", None)
+    )
+    LLM_CACHE_MAX_AGE_DAYS: float = field(default_factory=lambda: _env_float("LLM_CACHE_MAX_AGE_DAYS", 30.0))
+    LLM_CACHE_MAX_ENTRIES: int = field(default_factory=lambda: _env_int("LLM_CACHE_MAX_ENTRIES", 10000))
+    RAG_INT8_INDEX: bool = field(default_factory=lambda: _env_bool("RAG_INT8_INDEX", False))
+    BATCH_MODE: bool = field(default_factory=lambda: _env_bool("BATCH_MODE", False))
+    BATCH_FLUSH_SECONDS: float = field(default_factory=lambda: _env_float("BATCH_FLUSH_SECONDS", 60.0))
+    BATCH_MAX_ITEMS: int = field(default_factory=lambda: _env_int("BATCH_MAX_ITEMS", 100))
+
+
+_load_dotenv()
 settings = Settings()
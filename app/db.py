@@ -1,5 +1,6 @@
 # app/db.py
 from sqlalchemy import create_engine
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import sessionmaker, declarative_base
 
 from .config import settings
@@ -7,10 +8,19 @@ from .config import settings
 # Base class that all ORM models will inherit from
 Base = declarative_base()
 
+_is_sqlite = settings.DATABASE_URL.startswith("sqlite")
+
+# Size the pool for the concurrent endpoints (thread fan-out, batch worker).
+# In-memory SQLite uses a per-thread pool that takes no size arguments.
+_is_memory = settings.DATABASE_URL == "sqlite://" or ":memory:" in settings.DATABASE_URL
+_pool_kwargs = {} if _is_memory else {"pool_size": 10, "max_overflow": 20, "pool_recycle": 1800}
+
 # Create the SQLAlchemy engine using the config DATABASE_URL
 engine = create_engine(
     settings.DATABASE_URL,
-    connect_args={"check_same_thread": False} if settings.DATABASE_URL.startswith("sqlite") else {},
+    connect_args={"check_same_thread": False} if _is_sqlite else {},
+    pool_pre_ping=True,
+    **_pool_kwargs,
 )
 
 # Factory that will create new database sessions
@@ -23,11 +33,21 @@ def init_db() -> None:
 
     This imports the models module so that SQLAlchemy is aware of all
     mapped classes, then creates all tables in the database if they
-    don't exist yet.
+    don't exist yet, and seeds the table version counters.
     """
-    from . import models  # noqa: F401
+    from . import models
     Base.metadata.create_all(bind=engine)
 
+    # Seed version counters so writers only ever need an UPDATE
+    with SessionLocal() as db:
+        if db.get(models.TableVersion, "documents") is None:
+            db.add(models.TableVersion(name="documents", version=0))
+            try:
+                db.commit()
+            except IntegrityError:
+                # Another worker seeded it first
+                db.rollback()
+
 
 def get_db():
     """
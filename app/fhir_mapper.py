@@ -16,6 +16,36 @@ from typing import Dict, Any, List
 from .schemas import StructuredNote
 
 
+_ICD10_SYSTEM = "http://hl7.org/fhir/sid/icd-10-cm"
+_RXNORM_SYSTEM = "http://www.nlm.nih.gov/research/umls/rxnorm"
+_PATIENT_AGE_URL = "http://hl7.org/fhir/StructureDefinition/patient-age"
+
+# Fixed parts of each resource, unpacked into every new resource dict.
+# Nested values are shared between bundles, so they must never be mutated.
+_ACTIVE = {"text": "active"}
+_CONFIRMED = {"text": "confirmed"}
+
+_CONDITION_BASE = {
+    "resourceType": "Condition",
+    "clinicalStatus": _ACTIVE,
+    "verificationStatus": _CONFIRMED,
+}
+_MEDICATION_REQUEST_BASE = {
+    "resourceType": "MedicationRequest",
+    "status": "active",
+    "intent": "order",
+}
+_OBSERVATION_BASE = {
+    "resourceType": "Observation",
+    "status": "final",
+}
+_CAREPLAN_BASE = {
+    "resourceType": "CarePlan",
+    "status": "active",
+    "intent": "plan",
+}
+
+
 def structured_to_fhir(structured: StructuredNote) -> Dict[str, Any]:
     resources: List[Dict[str, Any]] = []
 
@@ -34,44 +64,42 @@ def structured_to_fhir(structured: StructuredNote) -> Dict[str, Any]:
             patient["name"] = [{"text": name_text}]
 
         if structured.patient.sex:
-            sex_lower = structured.patient.sex.lower()
-            if sex_lower in {"male", "female", "other", "unknown"}:
-                patient["gender"] = sex_lower
-            else:
-                patient["gender"] = "unknown"
+            # Already normalized to FHIR's gender codes by PatientInfo
+            patient["gender"] = structured.patient.sex
 
         if structured.patient.age:
             # We don't have birthDate, so we use an extension for age
             patient["extension"] = [
                 {
-                    "url": "http://hl7.org/fhir/StructureDefinition/patient-age",
+                    "url": _PATIENT_AGE_URL,
                     "valueInteger": structured.patient.age
                 }
             ]
 
     resources.append(patient)
 
+    # One reference object shared by every resource below (read-only)
+    subject_ref = {"reference": f"Patient/{patient_id}"}
+
     # -------------------
     # Conditions -> Condition
     # -------------------
     for idx, cond in enumerate(structured.conditions, start=1):
         cond_id = f"condition-{idx}"
         condition_resource: Dict[str, Any] = {
-            "resourceType": "Condition",
+            **_CONDITION_BASE,
             "id": cond_id,
-            "subject": {"reference": f"Patient/{patient_id}"},
-            "clinicalStatus": {"text": "active"},
-            "verificationStatus": {"text": "confirmed"},
+            "subject": subject_ref,
             "code": {
-                "text": cond.name,
+                "text": cond["name"],
             },
         }
 
-        if cond.icd10_code:
+        if cond.get("icd10_code"):
             condition_resource["code"]["coding"] = [
                 {
-                    "system": "http://hl7.org/fhir/sid/icd-10-cm",
-                    "code": cond.icd10_code,
+                    "system": _ICD10_SYSTEM,
+                    "code": cond["icd10_code"],
                 }
             ]
 
@@ -84,28 +112,26 @@ def structured_to_fhir(structured: StructuredNote) -> Dict[str, Any]:
         med_id = f"medreq-{idx}"
 
         med_text_parts = []
-        if med.dose:
-            med_text_parts.append(med.dose)
-        if med.frequency:
-            med_text_parts.append(med.frequency)
+        if med.get("dose"):
+            med_text_parts.append(med["dose"])
+        if med.get("frequency"):
+            med_text_parts.append(med["frequency"])
         dosage_text = " ".join(med_text_parts) if med_text_parts else None
 
         med_resource: Dict[str, Any] = {
-            "resourceType": "MedicationRequest",
+            **_MEDICATION_REQUEST_BASE,
             "id": med_id,
-            "subject": {"reference": f"Patient/{patient_id}"},
-            "status": "active",
-            "intent": "order",
+            "subject": subject_ref,
             "medicationCodeableConcept": {
-                "text": med.name,
+                "text": med["name"],
             },
         }
 
-        if med.rxnorm_code:
+        if med.get("rxnorm_code"):
             med_resource["medicationCodeableConcept"]["coding"] = [
                 {
-                    "system": "http://www.nlm.nih.gov/research/umls/rxnorm",
-                    "code": med.rxnorm_code,
+                    "system": _RXNORM_SYSTEM,
+                    "code": med["rxnorm_code"],
                 }
             ]
 
@@ -128,16 +154,15 @@ def structured_to_fhir(structured: StructuredNote) -> Dict[str, Any]:
         obs_id = f"observation-vital-{obs_counter}"
         obs_counter += 1
 
-        display_text = vital.type
-        value_text = vital.value
-        if vital.unit:
-            value_text = f"{value_text} {vital.unit}"
+        display_text = vital["type"]
+        value_text = vital["value"]
+        if vital.get("unit"):
+            value_text = f"{value_text} {vital['unit']}"
 
         obs_resource: Dict[str, Any] = {
-            "resourceType": "Observation",
+            **_OBSERVATION_BASE,
             "id": obs_id,
-            "status": "final",
-            "subject": {"reference": f"Patient/{patient_id}"},
+            "subject": subject_ref,
             "code": {
                 "text": display_text
             },
@@ -152,16 +177,15 @@ def structured_to_fhir(structured: StructuredNote) -> Dict[str, Any]:
         obs_id = f"observation-lab-{obs_counter}"
         obs_counter += 1
 
-        display_text = lab.name
-        value_text = lab.value
-        if lab.unit:
-            value_text = f"{value_text} {lab.unit}"
+        display_text = lab["name"]
+        value_text = lab.get("value")
+        if lab.get("unit"):
+            value_text = f"{value_text} {lab['unit']}"
 
         obs_resource: Dict[str, Any] = {
-            "resourceType": "Observation",
+            **_OBSERVATION_BASE,
             "id": obs_id,
-            "status": "final",
-            "subject": {"reference": f"Patient/{patient_id}"},
+            "subject": subject_ref,
             "code": {
                 "text": display_text
             },
@@ -176,15 +200,13 @@ def structured_to_fhir(structured: StructuredNote) -> Dict[str, Any]:
     if structured.plan:
         careplan_id = "careplan-1"
         # Join plan items into a narrative for simplicity
-        plan_descriptions = [item.description for item in structured.plan if item.description]
+        plan_descriptions = [item["description"] for item in structured.plan if item["description"]]
         narrative_text = " | ".join(plan_descriptions) if plan_descriptions else None
 
         careplan_resource: Dict[str, Any] = {
-            "resourceType": "CarePlan",
+            **_CAREPLAN_BASE,
             "id": careplan_id,
-            "subject": {"reference": f"Patient/{patient_id}"},
-            "status": "active",
-            "intent": "plan",
+            "subject": subject_ref,
         }
 
         if narrative_text:
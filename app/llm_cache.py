@@ -0,0 +1,216 @@
+# app/llm_cache.py
+
+"""
+Response cache for LLM calls made on clinical notes.
+
+- Exact hits are keyed by (kind, model, sha256(note)) and skip the LLM call.
+  `kind` carries a hash of the request template (see prompt_kind), so
+  editing a prompt or schema never serves replies made under the old one.
+- Entries expire after LLM_CACHE_MAX_AGE_DAYS, and only the newest
+  LLM_CACHE_MAX_ENTRIES are kept.
+- The cache is best-effort: get_or_compute and the safe_* helpers treat a
+  failing lookup as a miss and log a failing store, so a cache problem never
+  fails a request whose LLM call already succeeded.
+- Optionally, near-duplicate notes (e.g. templated visits) are matched by
+  cosine similarity of their embeddings. This is disabled by default since two
+  notes that differ only in a vital or lab value embed almost identically;
+  set LLM_CACHE_SEMANTIC_THRESHOLD (e.g. 0.97) to opt in.
+"""
+
+import functools
+import hashlib
+import json
+import logging
+import time
+from typing import Any, Callable, Dict, Optional, Tuple, TypeVar
+
+import numpy as np
+
+from .config import settings
+from .db import SessionLocal
+from . import models
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+
+def prompt_kind(name: str, request_template: Dict[str, Any]) -> str:
+    """
+    Cache kind for the prompt `name`: `name` plus a hash of its chat request
+    built for a placeholder note. Any change to the system prompt, user
+    prompt template, response_format or sampling parameters yields a new
+    kind, and with it an empty cache.
+    """
+    encoded = json.dumps(request_template, sort_keys=True, ensure_ascii=False)
+    return f"{name}:{hashlib.sha256(encoded.encode('utf-8')).hexdigest()[:16]}"
+
+
+def _note_sha(note: str) -> str:
+    return hashlib.sha256(note.encode("utf-8")).hexdigest()
+
+
+def _oldest_valid() -> float:
+    # Entries stored before this unix time are expired (0 disables expiry)
+    if not settings.LLM_CACHE_MAX_AGE_DAYS:
+        return 0.0
+    return time.time() - settings.LLM_CACHE_MAX_AGE_DAYS * 86400
+
+
+def _prune(db) -> None:
+    """
+    Delete expired entries and everything beyond the newest LLM_CACHE_MAX_ENTRIES.
+    """
+    entries = models.LLMCacheEntry
+    db.query(entries).filter(entries.created_at < _oldest_valid()).delete(synchronize_session=False)
+
+    if settings.LLM_CACHE_MAX_ENTRIES:
+        cutoff = (
+            db.query(entries.id)
+            .order_by(entries.id.desc())
+            .offset(settings.LLM_CACHE_MAX_ENTRIES)
+            .limit(1)
+            .scalar()
+        )
+        if cutoff is not None:
+            db.query(entries).filter(entries.id <= cutoff).delete(synchronize_session=False)
+
+
+def _nearest_response(db, kind: str, embedding: np.ndarray) -> Optional[str]:
+    """
+    Return the cached response whose note embedding is most similar to
+    `embedding`, if it clears the configured threshold.
+    """
+    rows = (
+        db.query(models.LLMCacheEntry.embedding, models.LLMCacheEntry.response)
+        .filter(
+            models.LLMCacheEntry.kind == kind,
+            models.LLMCacheEntry.model == settings.LLM_MODEL,
+            models.LLMCacheEntry.embedding_model == settings.EMBEDDING_MODEL,
+            models.LLMCacheEntry.embedding.isnot(None),
+            models.LLMCacheEntry.created_at >= _oldest_valid(),
+        )
+        .all()
+    )
+    if not rows:
+        return None
+
+    matrix = np.vstack([np.frombuffer(emb, dtype=np.float32) for emb, _ in rows])
+    matrix = matrix / (np.linalg.norm(matrix, axis=1, keepdims=True) + 1e-8)
+    query = embedding / (np.linalg.norm(embedding) + 1e-8)
+
+    sims = matrix @ query
+    best = int(np.argmax(sims))
+    if sims[best] >= settings.LLM_CACHE_SEMANTIC_THRESHOLD:
+        return rows[best][1]
+    return None
+
+
+@functools.lru_cache(maxsize=128)
+def _note_embedding(note: str) -> np.ndarray:
+    # Memoized so a miss followed by store() only embeds the note once
+    from .rag import embed_texts
+
+    return embed_texts([note])[0]
+
+
+def lookup(kind: str, note: str) -> Optional[str]:
+    """
+    Return the cached response for `note`, or None on a miss.
+
+    `kind` separates different prompts over the same note; build it with
+    prompt_kind().
+    """
+    if not settings.LLM_CACHE_ENABLED:
+        return None
+
+    with SessionLocal() as db:
+        hit = (
+            db.query(models.LLMCacheEntry.response)
+            .filter(
+                models.LLMCacheEntry.kind == kind,
+                models.LLMCacheEntry.model == settings.LLM_MODEL,
+                models.LLMCacheEntry.note_sha == _note_sha(note),
+                models.LLMCacheEntry.created_at >= _oldest_valid(),
+            )
+            .first()
+        )
+        if hit is not None:
+            return hit.response
+
+        if settings.LLM_CACHE_SEMANTIC_THRESHOLD:
+            return _nearest_response(db, kind, _note_embedding(note))
+
+    return None
+
+
+def store(kind: str, note: str, response_text: str) -> None:
+    """
+    Save the LLM response for `note`.
+    """
+    if not settings.LLM_CACHE_ENABLED:
+        return
+
+    embedding = _note_embedding(note) if settings.LLM_CACHE_SEMANTIC_THRESHOLD else None
+
+    with SessionLocal() as db:
+        db.add(
+            models.LLMCacheEntry(
+                kind=kind,
+                model=settings.LLM_MODEL,
+                note_sha=_note_sha(note),
+                embedding=embedding.tobytes() if embedding is not None else None,
+                embedding_model=settings.EMBEDDING_MODEL if embedding is not None else None,
+                response=response_text,
+                created_at=time.time(),
+            )
+        )
+        db.flush()
+        _prune(db)
+        db.commit()
+
+
+def safe_lookup(kind: str, note: str) -> Optional[str]:
+    """
+    lookup(), treating any cache failure (DB errors, embeddings errors) as a miss.
+    """
+    try:
+        return lookup(kind, note)
+    except Exception:
+        logger.exception("LLM cache lookup failed; treating it as a miss")
+        return None
+
+
+def safe_store(kind: str, note: str, response_text: str) -> None:
+    """
+    store(), logging and ignoring any cache failure.
+    """
+    try:
+        store(kind, note, response_text)
+    except Exception:
+        logger.exception("LLM cache store failed; response not cached")
+
+
+def get_or_compute(
+    kind: str,
+    note: str,
+    compute: Callable[[], Tuple[T, str, Any]],
+    decode: Callable[[str], T],
+) -> Tuple[T, Any]:
+    """
+    Return (value, usage) for `note`, calling `compute` only on a miss.
+
+    `compute` returns (value, response_text, usage). Only response_text is
+    cached, and `decode` rebuilds the value from it on a hit, so a fresh
+    reply that `compute` already parsed is not parsed again.
+
+    Cache hits spend no tokens, so usage is None. Cache failures fall back
+    to `compute` and never fail the call.
+    """
+    cached = safe_lookup(kind, note)
+    if cached is not None:
+        return decode(cached), None
+
+    value, response_text, usage = compute()
+    safe_store(kind, note, response_text)
+    return value, usage
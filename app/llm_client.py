@@ -1,8 +1,9 @@
 # app/llm_client.py
 
-from typing import Any
+from typing import Any, Dict, Iterator
 from openai import OpenAI
 from .config import settings
+from . import llm_cache
 
 # Create OpenAI client using the API key from .env
 client = OpenAI(
@@ -10,37 +11,94 @@ client = OpenAI(
     base_url=settings.OPENAI_BASE_URL
 )
 
+_SYSTEM_PROMPT_SUMMARIZE = (
+    "You are a clinical documentation assistant. "
+    "Summarize the following medical note into 3–5 concise bullet points, "
+    "focusing on chief complaint, key history, exam findings, and plan."
+    "Use the uploaded guidelines to further inform your summary, plan, and"
+    "recommendations."
+)
 
-def summarize_note(note: str) -> tuple[str, Any]:
+
+def prompt_cache_params(key: str) -> Dict[str, Any]:
     """
-    Summarize a medical note using OpenAI.
+    Extra request parameters asking the OpenAI API to route requests that
+    share a static prefix (the system prompt) to the same prompt cache, so
+    the prefix is not prefilled again and is billed at the cached-input rate.
 
-    The latest OpenAI SDK uses:
-    client.chat.completions.create()
+    Bump the key's version when the prompt it names changes. Nothing is sent
+    to OpenAI-compatible servers (OPENAI_BASE_URL), which may reject
+    unknown fields.
     """
+    if settings.OPENAI_BASE_URL:
+        return {}
+    return {"extra_body": {"prompt_cache_key": key}}
+
+
+def _summary_request(note: str) -> dict:
+    return {
+        "model": settings.LLM_MODEL,
+        "messages": [
+            {"role": "system", "content": _SYSTEM_PROMPT_SUMMARIZE},
+            {"role": "user", "content": f"Medical note:\n{note}"},
+        ],
+        "temperature": 0.2,
+        **prompt_cache_params("summarize_v1"),
+    }
+
+
+# LLM cache kind, tied to the exact request template above
+_CACHE_KIND_SUMMARIZE = llm_cache.prompt_kind("summarize", _summary_request("{note}"))
 
+
+def _require_api_key() -> None:
     if not settings.OPENAI_API_KEY:
         raise RuntimeError(
             "OPENAI_API_KEY is not set. Please add it to your .env file."
         )
 
-    system_prompt = (
-        "You are a clinical documentation assistant. "
-        "Summarize the following medical note into 3–5 concise bullet points, "
-        "focusing on chief complaint, key history, exam findings, and plan."
-        "Use the uploaded guidelines to further inform your summary, plan, and"
-        "recommendations."
-    )
 
-    response = client.chat.completions.create(
-        model=settings.LLM_MODEL,
-        messages=[
-            {"role": "system", "content": system_prompt},
-            {"role": "user", "content": f"Medical note:\n{note}"},
-        ],
-        temperature=0.2,
-    )
+def summarize_note(note: str) -> tuple[str, Any]:
+    """
+    Summarize a medical note using OpenAI.
 
-    summary_text = response.choices[0].message.content.strip()
-    usage = response.usage
+    The latest OpenAI SDK uses:
+    client.chat.completions.create()
+    """
+    _require_api_key()
+
+    def request_summary() -> tuple[str, str, Any]:
+        response = client.chat.completions.create(**_summary_request(note))
+        summary_text = response.choices[0].message.content.strip()
+        return summary_text, summary_text, response.usage
+
+    summary_text, usage = llm_cache.get_or_compute(
+        _CACHE_KIND_SUMMARIZE, note, request_summary, decode=str
+    )
     return summary_text, usage
+
+
+def stream_summary(note: str) -> Iterator[str]:
+    """
+    Like summarize_note, but yields the summary text as the model generates it.
+
+    Configuration errors are raised here, before the first chunk is sent.
+    """
+    _require_api_key()
+
+    cached = llm_cache.safe_lookup(_CACHE_KIND_SUMMARIZE, note)
+    if cached is not None:
+        return iter([cached])
+
+    def generate() -> Iterator[str]:
+        stream = client.chat.completions.create(**_summary_request(note), stream=True)
+
+        parts = []
+        for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                parts.append(chunk.choices[0].delta.content)
+                yield chunk.choices[0].delta.content
+
+        llm_cache.safe_store(_CACHE_KIND_SUMMARIZE, note, "".join(parts).strip())
+
+    return generate()
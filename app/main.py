@@ -1,9 +1,11 @@
 # app/main.py
 
 from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 
 from .db import init_db
+from . import batch
 from .routers import documents, llm, agent, fhir, workflow
 from .config import settings
 
@@ -11,6 +13,8 @@ from .config import settings
 app = FastAPI(
     title="AI Medical Backend",
     version="0.3.0",
+    # orjson is much faster than the stdlib encoder on large FHIR bundles
+    default_response_class=ORJSONResponse,
 )
 
 
@@ -22,6 +26,13 @@ def on_startup():
     Initialize the DB on startup.
     """
     init_db()
+    if settings.BATCH_MODE:
+        batch.start_worker()
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    batch.stop_worker()
 
 
 @app.get("/health")
@@ -1,5 +1,6 @@
 # app/models.py
-from sqlalchemy import Column, Integer, Text
+from sqlalchemy import Column, Float, ForeignKey, Integer, LargeBinary, Text
+from sqlalchemy.orm import relationship
 
 from .db import Base
 
@@ -18,3 +19,93 @@ class Document(Base):
     id = Column(Integer, primary_key=True, index=True)
     title = Column(Text, nullable=False)
     content = Column(Text, nullable=False)
+
+    embedding = relationship(
+        "DocumentEmbedding",
+        uselist=False,
+        cascade="all, delete-orphan",
+    )
+
+
+class DocumentEmbedding(Base):
+    """
+    SQLAlchemy ORM model for the 'document_embeddings' table.
+
+    Stores each document's RAG embedding so the index can be rebuilt
+    without calling the embeddings API again.
+
+    Fields:
+    - document_id: the embedded Document
+    - vector: float32 embedding bytes
+    - model: embedding model that produced `vector`
+    """
+    __tablename__ = "document_embeddings"
+
+    document_id = Column(Integer, ForeignKey("documents.id"), primary_key=True)
+    vector = Column(LargeBinary, nullable=False)
+    model = Column(Text, nullable=False)
+
+
+class LLMCacheEntry(Base):
+    """
+    SQLAlchemy ORM model for the 'llm_responses' table (see app/llm_cache.py).
+
+    Fields:
+    - kind: prompt that produced the response, with a hash of its request
+      template (e.g. "summarize:1f3a...")
+    - model: chat model name the response came from
+    - note_sha: sha256 hex digest of the input note
+    - embedding: float32 note embedding (only for semantic matching)
+    - embedding_model: embedding model used for `embedding`
+    - response: raw response text
+    - created_at: unix time the response was stored
+    """
+    __tablename__ = "llm_responses"
+
+    id = Column(Integer, primary_key=True, index=True)
+    kind = Column(Text, nullable=False)
+    model = Column(Text, nullable=False)
+    note_sha = Column(Text, nullable=False, index=True)
+    embedding = Column(LargeBinary, nullable=True)
+    embedding_model = Column(Text, nullable=True)
+    response = Column(Text, nullable=False)
+    created_at = Column(Float, nullable=False, index=True)
+
+
+class ExtractionJob(Base):
+    """
+    SQLAlchemy ORM model for the 'extraction_jobs' table (see app/batch.py).
+
+    Fields:
+    - id: job id returned to the caller
+    - note: raw clinical note to extract from
+    - status: "queued", "submitting", "submitted", "completed" or "failed"
+    - batch_id: OpenAI batch the job was submitted in (a claim id while "submitting")
+    - result: StructuredNote JSON once completed
+    - error: failure reason, if any
+    """
+    __tablename__ = "extraction_jobs"
+
+    id = Column(Text, primary_key=True)
+    note = Column(Text, nullable=False)
+    status = Column(Text, nullable=False, index=True)
+    batch_id = Column(Text, nullable=True)
+    result = Column(Text, nullable=True)
+    error = Column(Text, nullable=True)
+
+
+class TableVersion(Base):
+    """
+    SQLAlchemy ORM model for the 'table_versions' table.
+
+    A counter bumped in the same transaction as every write to a table,
+    used as its cache validator (see the ETag in routers/documents.py).
+
+    Fields:
+    - name: versioned table name (e.g. "documents")
+    - version: incremented on every write
+    """
+    __tablename__ = "table_versions"
+
+    name = Column(Text, primary_key=True)
+    version = Column(Integer, nullable=False, default=0)
@@ -4,23 +4,44 @@
 Simple Retrieval-Augmented Generation (RAG) implementation.
 
 - Reads documents from the database
-- Embeds them using OpenAI embeddings
+- Embeds them using OpenAI embeddings (stored per document, so each
+  document is only embedded once)
 - On a question:
   - Embeds the question
   - Finds most similar documents using cosine similarity
+    (inner product over pre-normalized embeddings, via FAISS when installed)
   - Sends context + question to the chat model
 """
 
-from typing import List, Tuple
+import functools
+import queue
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, List, NamedTuple, Optional, Tuple
 
 import numpy as np
 from openai import OpenAI
+from sqlalchemy import select
 
 from .config import settings
 from .db import SessionLocal
 from . import models
 
 
+@functools.lru_cache(maxsize=None)
+def _load_faiss():
+    """
+    Import FAISS on first index build rather than at app startup.
+    Returns None when it isn't installed (retrieval falls back to a numpy scan).
+    """
+    try:
+        import faiss
+    except ImportError:
+        return None
+    return faiss
+
+
 # Create an OpenAI client
 client = OpenAI(
     api_key=settings.OPENAI_API_KEY,
@@ -28,13 +49,18 @@ client = OpenAI(
 )
 
 
-def _embed_texts(texts: List[str]) -> np.ndarray:
+# Max inputs per embeddings API request
+_EMBED_BATCH_SIZE = 100
+# How long the query batcher waits to collect concurrent queries
+_EMBED_BATCH_WINDOW_SECONDS = 0.02
+# Rows fetched per round trip while building the index
+_INDEX_BUILD_BATCH_SIZE = 500
+
+
+def _embed_chunk(texts: List[str]) -> np.ndarray:
     """
-    Get embeddings for a list of texts using OpenAI embeddings API.
+    One embeddings API request for up to _EMBED_BATCH_SIZE texts.
     """
-    if not settings.OPENAI_API_KEY:
-        raise RuntimeError("OPENAI_API_KEY is not set for embeddings.")
-
     response = client.embeddings.create(
         model=settings.EMBEDDING_MODEL,
         input=texts,
@@ -44,69 +70,265 @@ def _embed_texts(texts: List[str]) -> np.ndarray:
     return np.array(vectors, dtype="float32")
 
 
-def _cosine_sim(a: np.ndarray, b: np.ndarray) -> float:
+def embed_texts(texts: List[str]) -> np.ndarray:
     """
-    Compute cosine similarity between two vectors.
+    Get embeddings for a list of texts using OpenAI embeddings API.
+
+    Duplicate texts are embedded once, and large lists are split into
+    _EMBED_BATCH_SIZE requests that run in parallel.
     """
-    denom = (np.linalg.norm(a) * np.linalg.norm(b)) or 1e-8
-    return float(np.dot(a, b) / denom)
+    if not settings.OPENAI_API_KEY:
+        raise RuntimeError("OPENAI_API_KEY is not set for embeddings.")
+
+    unique = list(dict.fromkeys(texts))
+    chunks = [unique[i:i + _EMBED_BATCH_SIZE] for i in range(0, len(unique), _EMBED_BATCH_SIZE)]
+
+    if len(chunks) == 1:
+        vectors = _embed_chunk(chunks[0])
+    else:
+        with ThreadPoolExecutor(max_workers=min(len(chunks), 8)) as executor:
+            vectors = np.vstack(list(executor.map(_embed_chunk, chunks)))
+
+    position = {text: i for i, text in enumerate(unique)}
+    return vectors[[position[text] for text in texts]]
+
+
+class _QueryEmbedder:
+    """
+    Collapses concurrent single-text embedding requests (e.g. RAG questions
+    from parallel requests) into one API call per short time window.
+    """
+
+    def __init__(self) -> None:
+        self._queue: "queue.Queue[Tuple[str, Future]]" = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: threading.Thread | None = None
+
+    def embed(self, text: str) -> np.ndarray:
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="query-embedder", daemon=True)
+                self._thread.start()
+
+        future: Future = Future()
+        self._queue.put((text, future))
+        return future.result()
+
+    def _run(self) -> None:
+        while True:
+            batch = [self._queue.get()]
+            deadline = time.monotonic() + _EMBED_BATCH_WINDOW_SECONDS
+            while len(batch) < _EMBED_BATCH_SIZE:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self._queue.get(timeout=remaining))
+                except queue.Empty:
+                    break
+
+            try:
+                vectors = embed_texts([text for text, _ in batch])
+            except Exception as e:
+                for _, future in batch:
+                    future.set_exception(e)
+                continue
+
+            for (_, future), vec in zip(batch, vectors):
+                future.set_result(vec)
+
+
+_query_embedder = _QueryEmbedder()
+
+
+def set_document_embedding(doc: models.Document, vector: np.ndarray) -> None:
+    """
+    Attach `vector` as the stored embedding of `doc` (caller commits).
+    """
+    doc.embedding = models.DocumentEmbedding(
+        vector=np.asarray(vector, dtype="float32").tobytes(),
+        model=settings.EMBEDDING_MODEL,
+    )
+
+
+def _normalize_rows(vectors: np.ndarray) -> np.ndarray:
+    """
+    L2-normalize each row so cosine similarity becomes a plain dot product.
+    """
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    return (vectors / (norms + 1e-8)).astype("float32", copy=False)
+
+
+class _IndexSnapshot(NamedTuple):
+    """
+    One consistent view of the index; row i of `index`/`embeddings` is
+    document doc_ids[i]. Never mutated, only replaced as a whole.
+    """
+
+    doc_ids: Tuple[int, ...]
+    # Inner-product FAISS index over the embeddings (None without faiss).
+    index: Any
+    # Unit-length rows, so `embeddings @ query` gives cosine similarities.
+    # Only kept when there is no FAISS index to search instead.
+    embeddings: Optional[np.ndarray]
 
 
 class SimpleRAG:
     """
     Minimal in-memory RAG system.
+
+    Queries read self._snapshot once and work on that, so a concurrent
+    invalidate() or rebuild never changes the index under them.
     """
 
     def __init__(self) -> None:
-        self.doc_ids: List[int] = []
-        self.doc_texts: List[str] = []
-        self.embeddings: np.ndarray | None = None
+        self._snapshot: Optional[_IndexSnapshot] = None
+        # Serializes rebuilds so concurrent first queries embed each document once
+        self._build_lock = threading.Lock()
+        # Bumped by invalidate(); a build that started before is not published
+        self._generation = 0
 
-    def build_index_from_db(self) -> None:
+    def build_index_from_db(self) -> _IndexSnapshot:
+        """
+        Rebuild the index from the DB and publish it.
         """
-        Load all documents and build embeddings.
+        with self._build_lock:
+            return self._rebuild_locked()
+
+    def _rebuild_locked(self) -> _IndexSnapshot:
+        generation = self._generation
+        snapshot = self._load_snapshot()
+        # A document changed while we were reading: serve this snapshot to
+        # the caller, but leave the next query to rebuild.
+        if generation == self._generation:
+            self._snapshot = snapshot
+        return snapshot
+
+    def _load_snapshot(self) -> _IndexSnapshot:
         """
-        db = SessionLocal()
-        docs = db.query(models.Document).all()
-        db.close()
+        Load all stored document embeddings, streaming rows from the DB in
+        batches instead of materializing the whole table.
 
-        self.doc_ids = [d.id for d in docs]
-        self.doc_texts = [d.content for d in docs]
+        Only documents without an embedding for the current EMBEDDING_MODEL
+        are sent to the embeddings API; their vectors are saved for next time.
+        Document texts are not kept in memory (retrieve() loads the top-k).
+        """
+        doc_ids: List[int] = []
+        vectors: List[np.ndarray | None] = []
+
+        with SessionLocal() as db:
+            stmt = (
+                select(
+                    models.Document.id,
+                    models.DocumentEmbedding.vector,
+                    models.DocumentEmbedding.model,
+                )
+                .outerjoin(models.DocumentEmbedding)
+                .order_by(models.Document.id)
+                .execution_options(yield_per=_INDEX_BUILD_BATCH_SIZE)
+            )
+            for batch in db.execute(stmt).partitions():
+                for doc_id, vector, model in batch:
+                    doc_ids.append(doc_id)
+                    if vector is not None and model == settings.EMBEDDING_MODEL:
+                        vectors.append(np.frombuffer(vector, dtype="float32"))
+                    else:
+                        vectors.append(None)
+
+            missing = [i for i, vec in enumerate(vectors) if vec is None]
+            for start in range(0, len(missing), _INDEX_BUILD_BATCH_SIZE):
+                positions = missing[start:start + _INDEX_BUILD_BATCH_SIZE]
+                ids = [doc_ids[i] for i in positions]
+                contents = dict(
+                    db.query(models.Document.id, models.Document.content)
+                    .filter(models.Document.id.in_(ids))
+                    .all()
+                )
+                fresh = embed_texts([contents[doc_id] for doc_id in ids])
+                for i, doc_id, vec in zip(positions, ids, fresh):
+                    vectors[i] = vec
+                    db.merge(models.DocumentEmbedding(
+                        document_id=doc_id,
+                        vector=vec.tobytes(),
+                        model=settings.EMBEDDING_MODEL,
+                    ))
+                db.commit()
+
+        if not doc_ids:
+            return _IndexSnapshot((), None, None)
+
+        embeddings = _normalize_rows(np.vstack(vectors))
+
+        faiss = _load_faiss()
+        if faiss is None:
+            return _IndexSnapshot(tuple(doc_ids), None, embeddings)
+
+        dim = embeddings.shape[1]
+        if settings.RAG_INT8_INDEX:
+            # 1 byte per dimension instead of 4: less memory moved per query,
+            # at a small recall cost.
+            index = faiss.IndexScalarQuantizer(
+                dim, faiss.ScalarQuantizer.QT_8bit, faiss.METRIC_INNER_PRODUCT
+            )
+            index.train(embeddings)
+        else:
+            index = faiss.IndexFlatIP(dim)
+        index.add(embeddings)
 
-        if not self.doc_texts:
-            self.embeddings = None
-            return
+        return _IndexSnapshot(tuple(doc_ids), index, None)
 
-        self.embeddings = _embed_texts(self.doc_texts)
+    def invalidate(self) -> None:
+        """
+        Drop the in-memory index so the next query reloads it from the DB.
+        """
+        self._generation += 1
+        self._snapshot = None
 
-    def _ensure_index_built(self) -> None:
-        if self.embeddings is None:
-            self.build_index_from_db()
+    def _ensure_index_built(self) -> _IndexSnapshot:
+        snapshot = self._snapshot
+        if snapshot is not None:
+            return snapshot
+
+        with self._build_lock:
+            # Another query may have finished building while we waited
+            snapshot = self._snapshot
+            if snapshot is None:
+                snapshot = self._rebuild_locked()
+            return snapshot
 
     def retrieve(self, query: str, k: int = 3) -> List[Tuple[int, str]]:
         """
         Return the top-k most similar documents to the query.
         """
-        self._ensure_index_built()
+        snapshot = self._ensure_index_built()
 
-        if self.embeddings is None or not self.doc_texts:
+        if not snapshot.doc_ids:
             return []
 
-        query_vec = _embed_texts([query])[0]
-
-        sims = [
-            _cosine_sim(query_vec, doc_vec)
-            for doc_vec in self.embeddings
-        ]
+        query_vec = _normalize_rows(_query_embedder.embed(query))
+        k = min(k, len(snapshot.doc_ids))
 
-        ranked = sorted(
-            zip(self.doc_ids, self.doc_texts, sims),
-            key=lambda x: x[2],
-            reverse=True,
-        )
-
-        top = ranked[:k]
-        return [(doc_id, text) for doc_id, text, _ in top]
+        if snapshot.index is not None:
+            _, idx = snapshot.index.search(query_vec[None, :], k)
+            top = [i for i in idx[0] if i >= 0]
+        else:
+            # One matrix-vector product for all documents
+            sims = snapshot.embeddings @ query_vec
+
+            # Only sort the k best candidates instead of the whole corpus
+            top = np.argpartition(sims, -k)[-k:]
+            top = top[np.argsort(sims[top])[::-1]]
+
+        top_ids = [snapshot.doc_ids[i] for i in top]
+        with SessionLocal() as db:
+            texts = dict(
+                db.query(models.Document.id, models.Document.content)
+                .filter(models.Document.id.in_(top_ids))
+                .all()
+            )
+
+        # Skip documents deleted since the index was built
+        return [(doc_id, texts[doc_id]) for doc_id in top_ids if doc_id in texts]
 
     def answer(self, question: str, note: str | None = None) -> dict:
         """
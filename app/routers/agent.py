@@ -1,23 +1,75 @@
 # app/routers/agent.py
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, status
 
 from .. import schemas
+from .. import batch
 from ..agent import extract_structured_note
+from ..config import settings
+from .deps import json_body, json_body_openapi
 
 # NOTE: no prefix here; prefix is added in main.py
 router = APIRouter(tags=["agent"])
 
 
-@router.post("/extract_structured", response_model=schemas.ExtractStructuredResponse)
-def extract_structured_endpoint(body: schemas.ExtractStructuredRequest):
+@router.post(
+    "/extract_structured",
+    response_model=schemas.ExtractStructuredResponse,
+    # Extracted notes are sparse; leave out the null fields
+    response_model_exclude_none=True,
+    openapi_extra=json_body_openapi(schemas.ExtractStructuredRequest),
+)
+def extract_structured_endpoint(
+    body: schemas.ExtractStructuredRequest = Depends(json_body(schemas.ExtractStructuredRequest)),
+):
     """
     Takes a raw clinical note and returns structured data
     enriched with ICD-10 and RxNorm codes.
     """
     try:
-        structured = extract_structured_note(body.note)
+        structured, _ = extract_structured_note(body.note)
         return schemas.ExtractStructuredResponse(structured=structured)
     except Exception as e:
         # In production, you'd have more granular error handling and logging
         raise HTTPException(status_code=500, detail=str(e))
+
+
+def _job_response(job) -> schemas.ExtractJobResponse:
+    structured = schemas.StructuredNote.model_validate_json(job.result) if job.result else None
+    return schemas.ExtractJobResponse(
+        job_id=job.id,
+        status=job.status,
+        structured=structured,
+        error=job.error,
+    )
+
+
+@router.post(
+    "/extract_structured_async",
+    response_model=schemas.ExtractJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    openapi_extra=json_body_openapi(schemas.ExtractStructuredRequest),
+)
+def extract_structured_async_endpoint(
+    body: schemas.ExtractStructuredRequest = Depends(json_body(schemas.ExtractStructuredRequest)),
+):
+    """
+    Queue a note for structured extraction through the OpenAI Batch API
+    (half price, results within 24h). Poll /agent/jobs/{job_id} for the result.
+    """
+    if not settings.BATCH_MODE:
+        raise HTTPException(status_code=503, detail="Batch mode is disabled (set BATCH_MODE=true).")
+
+    job = batch.enqueue(body.note)
+    return _job_response(job)
+
+
+@router.get("/jobs/{job_id}", response_model=schemas.ExtractJobResponse)
+def get_job_endpoint(job_id: str):
+    """
+    Status of a queued extraction job, with the structured data once completed.
+    """
+    job = batch.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return _job_response(job)
@@ -0,0 +1,76 @@
+# app/routers/deps.py
+
+"""
+Shared route dependencies and response helpers.
+"""
+
+from typing import Any, Awaitable, Callable, Dict, Type, TypeVar
+
+from fastapi import Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel, ValidationError
+
+M = TypeVar("M", bound=BaseModel)
+
+
+def json_body(model: Type[M]) -> Callable[[Request], Awaitable[M]]:
+    """
+    Dependency that validates the raw request body with model_validate_json.
+
+    pydantic-core parses the JSON bytes and builds the fields in one pass,
+    instead of FastAPI decoding the body to Python objects first and then
+    validating them. Matters for routes that carry multi-KB clinical notes.
+
+    Pair it with openapi_extra=json_body_openapi(model) so the request body
+    still shows up in the docs.
+    """
+
+    async def parse(request: Request) -> M:
+        raw = await request.body()
+        try:
+            return model.model_validate_json(raw)
+        except ValidationError as e:
+            # Same 422 shape FastAPI produces for regular body parameters
+            errors = [{**err, "loc": ("body", *err["loc"])} for err in e.errors(include_url=False)]
+            raise RequestValidationError(errors, body=raw)
+
+    return parse
+
+
+def _inline_defs(schema: Any, defs: Dict[str, Any]) -> Any:
+    # "#/$defs/..." refs would resolve against the OpenAPI document root,
+    # so nested models are inlined (request models here are not recursive).
+    if isinstance(schema, dict):
+        ref = schema.get("$ref", "")
+        if ref.startswith("#/$defs/"):
+            return _inline_defs(defs[ref.removeprefix("#/$defs/")], defs)
+        return {key: _inline_defs(value, defs) for key, value in schema.items()}
+    if isinstance(schema, list):
+        return [_inline_defs(item, defs) for item in schema]
+    return schema
+
+
+def json_body_openapi(model: Type[BaseModel]) -> Dict[str, Any]:
+    schema = model.model_json_schema()
+    schema = _inline_defs(schema, schema.pop("$defs", {}))
+    return {
+        "requestBody": {
+            "required": True,
+            "content": {"application/json": {"schema": schema}},
+        }
+    }
+
+
+class PydanticJSONResponse(JSONResponse):
+    """
+    JSON response for an already-validated Pydantic model.
+
+    The model is written straight to bytes by its own compiled serializer,
+    skipping FastAPI's response_model re-validation and jsonable_encoder walk.
+    """
+
+    def render(self, content: Any) -> bytes:
+        if isinstance(content, BaseModel):
+            return content.__pydantic_serializer__.to_json(content)
+        return super().render(content)
@@ -1,21 +1,54 @@
 # app/routers/documents.py
+import logging
 from typing import List
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, status
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
 from ..db import get_db
 from .. import models, schemas
+from ..rag import rag, embed_texts, set_document_embedding
+from .deps import json_body, json_body_openapi
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
 
-@router.get("/", response_model=List[schemas.DocumentRead])
-def list_documents(db: Session = Depends(get_db)):
+def _documents_etag(db: Session) -> str:
+    """
+    Version of the documents table, bumped by every create and delete.
+    """
+    version = db.get(models.TableVersion, "documents").version
+    return f'"{version}"'
+
+
+def _bump_documents_version(db: Session) -> None:
+    # Atomic increment in the caller's transaction, committed with the write
+    db.execute(
+        update(models.TableVersion)
+        .where(models.TableVersion.name == "documents")
+        .values(version=models.TableVersion.version + 1)
+    )
+
+
+@router.get("/", response_model=List[schemas.DocumentRead], response_model_exclude={"__all__": {"content"}})
+def list_documents(request: Request, response: Response, db: Session = Depends(get_db)):
     """
     Return a list of all documents (id, title).
+
+    Sends an ETag; if the client's If-None-Match still matches, returns
+    304 Not Modified without loading the list.
     """
-    return db.query(models.Document).all()
+    etag = _documents_etag(db)
+
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match and etag in [tag.strip() for tag in if_none_match.split(",")]:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
+
+    response.headers["ETag"] = etag
+    return db.query(models.Document.id, models.Document.title).all()
 
 
 @router.delete("/{doc_id}", status_code=status.HTTP_204_NO_CONTENT)
@@ -28,14 +61,23 @@ def delete_document(doc_id: int, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Document not found")
     
     db.delete(db_doc)
+    _bump_documents_version(db)
     db.commit()
+    rag.invalidate()
     return None
 
 
 @router.post(
-    "/", response_model=schemas.DocumentRead, status_code=status.HTTP_201_CREATED
+    "/",
+    response_model=schemas.DocumentRead,
+    response_model_exclude={"content"},
+    status_code=status.HTTP_201_CREATED,
+    openapi_extra=json_body_openapi(schemas.DocumentCreate),
 )
-def create_document(doc: schemas.DocumentCreate, db: Session = Depends(get_db)):
+def create_document(
+    doc: schemas.DocumentCreate = Depends(json_body(schemas.DocumentCreate)),
+    db: Session = Depends(get_db),
+):
     """
     Create a new document with title and content.
 
@@ -43,13 +85,22 @@ def create_document(doc: schemas.DocumentCreate, db: Session = Depends(get_db)):
     Response: { "id": 1, "title": "..." }
     """
     db_doc = models.Document(title=doc.title, content=doc.content)
+
+    try:
+        set_document_embedding(db_doc, embed_texts([doc.content])[0])
+    except Exception:
+        # Best-effort: the RAG index embeds it on the next rebuild instead
+        logger.exception("Embedding new document failed; deferring it to the next index build")
+
     db.add(db_doc)
+    _bump_documents_version(db)
     db.commit()
     db.refresh(db_doc)
+    rag.invalidate()
     return db_doc
 
 
-@router.get("/{doc_id}", response_model=schemas.DocumentReadContent)
+@router.get("/{doc_id}", response_model=schemas.DocumentRead)
 def get_document(doc_id: int, db: Session = Depends(get_db)):
     """
     Fetch a single document by ID.
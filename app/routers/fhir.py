@@ -1,20 +1,26 @@
 # app/routers/fhir.py
 
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
 
 from .. import schemas
 from ..fhir_mapper import structured_to_fhir
+from .deps import PydanticJSONResponse, json_body, json_body_openapi
 
 router = APIRouter(tags=["fhir"])
 
 
-@router.post("/to_fhir", response_model=schemas.ToFhirResponse)
-def to_fhir_endpoint(body: schemas.ToFhirRequest):
+@router.post(
+    "/to_fhir",
+    response_model=schemas.ToFhirResponse,
+    response_class=PydanticJSONResponse,
+    openapi_extra=json_body_openapi(schemas.ToFhirRequest),
+)
+def to_fhir_endpoint(body: schemas.ToFhirRequest = Depends(json_body(schemas.ToFhirRequest))):
     """
     Takes the structured data (from Part 4) and returns a simplified FHIR-like JSON Bundle.
     """
     try:
         bundle = structured_to_fhir(body.structured)
-        return schemas.ToFhirResponse(fhir=bundle)
+        return PydanticJSONResponse(schemas.ToFhirResponse(fhir=bundle))
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
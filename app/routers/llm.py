@@ -1,16 +1,22 @@
 # app/routers/llm.py
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import StreamingResponse
 
 from .. import schemas
-from ..llm_client import summarize_note
+from ..llm_client import summarize_note, stream_summary
 from ..rag import rag
+from .deps import json_body, json_body_openapi
 
 
 router = APIRouter()
 
 
-@router.post("/summarize_note", response_model=schemas.SummarizeResponse)
-def summarize_endpoint(body: schemas.SummarizeRequest):
+@router.post(
+    "/summarize_note",
+    response_model=schemas.SummarizeResponse,
+    openapi_extra=json_body_openapi(schemas.SummarizeRequest),
+)
+def summarize_endpoint(body: schemas.SummarizeRequest = Depends(json_body(schemas.SummarizeRequest))):
     try:
         summary, _ = summarize_note(body.note)
         return schemas.SummarizeResponse(summary=summary)
@@ -18,8 +24,27 @@ def summarize_endpoint(body: schemas.SummarizeRequest):
         raise HTTPException(status_code=500, detail=str(e))
 
 
-@router.post("/answer_question", response_model=schemas.AnswerResponse)
-def answer_question_endpoint(body: schemas.QuestionRequest):
+@router.post(
+    "/summarize_note/stream",
+    response_class=StreamingResponse,
+    openapi_extra=json_body_openapi(schemas.SummarizeRequest),
+)
+def summarize_stream_endpoint(body: schemas.SummarizeRequest = Depends(json_body(schemas.SummarizeRequest))):
+    """
+    Streams the summary back as plain text while it is being generated.
+    """
+    try:
+        return StreamingResponse(stream_summary(body.note), media_type="text/plain")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=str(e))
+
+
+@router.post(
+    "/answer_question",
+    response_model=schemas.AnswerResponse,
+    openapi_extra=json_body_openapi(schemas.QuestionRequest),
+)
+def answer_question_endpoint(body: schemas.QuestionRequest = Depends(json_body(schemas.QuestionRequest))):
     try:
         result = rag.answer(body.question)
         return schemas.AnswerResponse(
@@ -1,70 +1,85 @@
 # app/routers/workflow.py
 
-from fastapi import APIRouter, HTTPException
-from pydantic import BaseModel
+import asyncio
+
+from fastapi import APIRouter, Depends, HTTPException
 
 from .. import schemas
-from ..llm_client import summarize_note
-from ..llm_client import summarize_note
 from ..rag import rag
-from ..agent import extract_structured_note
+from ..agent import summarize_and_extract
 from ..fhir_mapper import structured_to_fhir
+from .deps import PydanticJSONResponse, json_body, json_body_openapi
 
 router = APIRouter(tags=["workflow"])
 
 
-class FullWorkflowRequest(BaseModel):
-    note: str
-    question: str | None = None  # for RAG (optional)
+def _total_usage(*usages) -> schemas.TokenUsage:
+    """
+    Sum OpenAI usage objects (None on a cache hit) into one TokenUsage.
+    """
+    input_tokens = cached_input_tokens = output_tokens = total_tokens = 0
+    for usage in usages:
+        if not usage:
+            continue
+        input_tokens += usage.prompt_tokens
+        output_tokens += usage.completion_tokens
+        total_tokens += usage.total_tokens
+
+        details = getattr(usage, "prompt_tokens_details", None)
+        if details and details.cached_tokens:
+            cached_input_tokens += details.cached_tokens
+
+    return schemas.TokenUsage(
+        input_tokens=input_tokens,
+        cached_input_tokens=cached_input_tokens,
+        output_tokens=output_tokens,
+        total_tokens=total_tokens,
+    )
 
 
-@router.post("/full_workflow", response_model=schemas.FullWorkflowResponse)
-def full_workflow(body: FullWorkflowRequest):
+@router.post(
+    "/full_workflow",
+    response_model=schemas.FullWorkflowResponse,
+    response_class=PydanticJSONResponse,
+    openapi_extra=json_body_openapi(schemas.FullWorkflowRequest),
+)
+async def full_workflow(body: schemas.FullWorkflowRequest = Depends(json_body(schemas.FullWorkflowRequest))):
     """
     Orchestrates the full end-to-end workflow:
-    1) Summarize note
-    2) (Optional) RAG answer to a question
-    3) Agent: structured extraction
-    4) FHIR Bundle conversion
+    1) Summarize note + agent structured extraction (one LLM call)
+    2) (Optional) RAG answer to a question, run concurrently with step 1
+    3) FHIR Bundle conversion
     """
     try:
-        total_usage = schemas.TokenUsage()
-
-        # 1) Summarize note
-        summary, sum_usage = summarize_note(body.note)
-        if sum_usage:
-            total_usage.input_tokens += sum_usage.prompt_tokens
-            total_usage.output_tokens += sum_usage.completion_tokens
-            total_usage.total_tokens += sum_usage.total_tokens
-
-        # 2) RAG question (optional)
-        rag_answer = None
+        # 1) + 2) are independent, so run them side by side. The underlying
+        # clients are blocking, so each call runs on a worker thread.
+        extract_task = asyncio.to_thread(summarize_and_extract, body.note)
         if body.question:
             # rag.answer returns a dict with "answer", "used_documents", and "usage"
-            result = rag.answer(body.question, note=body.note)
+            rag_task = asyncio.to_thread(rag.answer, body.question, note=body.note)
+            (summary, structured, struct_usage), result = await asyncio.gather(extract_task, rag_task)
+        else:
+            summary, structured, struct_usage = await extract_task
+            result = None
+
+        # 2) RAG answer (optional)
+        rag_answer = None
+        rag_usage = None
+        if result is not None:
             rag_answer = result["answer"]
             rag_usage = result.get("usage")
-            if rag_usage:
-                total_usage.input_tokens += rag_usage.prompt_tokens
-                total_usage.output_tokens += rag_usage.completion_tokens
-                total_usage.total_tokens += rag_usage.total_tokens
-
-        # 3) Structured extraction
-        structured, struct_usage = extract_structured_note(body.note)
-        if struct_usage:
-            total_usage.input_tokens += struct_usage.prompt_tokens
-            total_usage.output_tokens += struct_usage.completion_tokens
-            total_usage.total_tokens += struct_usage.total_tokens
 
-        # 4) FHIR conversion
+        # 3) FHIR conversion
         fhir_bundle = structured_to_fhir(structured)
 
-        return schemas.FullWorkflowResponse(
+        response = schemas.FullWorkflowResponse(
             summary=summary,
             rag_answer=rag_answer,
             structured=structured,
             fhir=fhir_bundle,
-            usage=total_usage,
+            usage=_total_usage(struct_usage, rag_usage),
         )
+        # Already validated on construction; skip FastAPI's response_model pass
+        return PydanticJSONResponse(response)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
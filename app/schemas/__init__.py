@@ -0,0 +1,70 @@
+# app/schemas/__init__.py
+
+"""
+API schemas, split by direction:
+
+- common:    the StructuredNote model and its items, used on both sides
+- requests:  request bodies
+- responses: response bodies
+
+Everything is re-exported here, so callers keep using `schemas.X`.
+"""
+
+from .common import (
+    Condition,
+    InternedStr,
+    LabResult,
+    Medication,
+    PatientInfo,
+    PlanItem,
+    Sex,
+    StructuredNote,
+    VitalSign,
+)
+from .requests import (
+    DocumentCreate,
+    ExtractStructuredRequest,
+    FullWorkflowRequest,
+    QuestionRequest,
+    SummarizeRequest,
+    ToFhirRequest,
+)
+from .responses import (
+    AnswerResponse,
+    DocumentRead,
+    ExtractJobResponse,
+    ExtractStructuredResponse,
+    FullWorkflowResponse,
+    SummarizeResponse,
+    ToFhirResponse,
+    TokenUsage,
+)
+
+__all__ = [
+    # common
+    "Condition",
+    "InternedStr",
+    "LabResult",
+    "Medication",
+    "PatientInfo",
+    "PlanItem",
+    "Sex",
+    "StructuredNote",
+    "VitalSign",
+    # requests
+    "DocumentCreate",
+    "ExtractStructuredRequest",
+    "FullWorkflowRequest",
+    "QuestionRequest",
+    "SummarizeRequest",
+    "ToFhirRequest",
+    # responses
+    "AnswerResponse",
+    "DocumentRead",
+    "ExtractJobResponse",
+    "ExtractStructuredResponse",
+    "FullWorkflowResponse",
+    "SummarizeResponse",
+    "ToFhirResponse",
+    "TokenUsage",
+]
@@ -0,0 +1,83 @@
+# app/schemas/common.py
+
+"""
+Structured note models shared by request and response schemas.
+"""
+
+import sys
+
+from pydantic import AfterValidator, BaseModel, Field, field_validator
+from typing import Annotated, List, Literal, Optional, Any, get_args
+from typing_extensions import NotRequired, TypedDict  # pydantic needs this TypedDict on Python < 3.12
+
+
+# ---------- Structured Data Extraction (Part 4) ----------
+
+# Same value set as FHIR's administrative gender
+Sex = Literal["male", "female", "other", "unknown"]
+_SEX_ALIASES = {"m": "male", "f": "female"}
+
+
+class PatientInfo(BaseModel):
+    name: Optional[str] = None
+    age: Optional[int] = None
+    sex: Optional[Sex] = None
+
+    @field_validator("sex", mode="before")
+    @classmethod
+    def _normalize_sex(cls, value: Any) -> Any:
+        # Accept "Male", "F", ... and map anything unrecognized to "unknown"
+        if not isinstance(value, str):
+            return value
+        value = value.strip().lower()
+        if not value:
+            return None
+        value = _SEX_ALIASES.get(value, value)
+        return value if value in get_args(Sex) else "unknown"
+
+
+# List items are plain TypedDicts rather than models: they carry no logic,
+# and validating them as dicts skips one model construction per item.
+
+class Condition(TypedDict):
+    name: str
+    icd10_code: NotRequired[Optional[str]]
+
+
+class Medication(TypedDict):
+    name: str
+    dose: NotRequired[Optional[str]]
+    route: NotRequired[Optional[str]]
+    frequency: NotRequired[Optional[str]]
+    rxnorm_code: NotRequired[Optional[str]]
+
+
+# Vital/lab names and units come from a small vocabulary; interning them
+# lets every note share one string object per term.
+InternedStr = Annotated[str, AfterValidator(sys.intern)]
+
+
+class VitalSign(TypedDict):
+    type: InternedStr          # e.g., "blood pressure"
+    value: str         # e.g., "140/90"
+    unit: NotRequired[Optional[InternedStr]]  # e.g., "mmHg"
+
+
+class LabResult(TypedDict):
+    name: InternedStr          # e.g., "HbA1c"
+    value: NotRequired[Optional[str]]         # e.g., "7.2"
+    unit: NotRequired[Optional[InternedStr]]  # e.g., "%"
+
+
+class PlanItem(TypedDict):
+    description: str   # e.g., "Start lisinopril 10 mg daily"
+
+
+class StructuredNote(BaseModel):
+    # Usually sparse: most optional fields are null for a given note.
+    patient: Optional[PatientInfo] = None
+    conditions: List[Condition] = Field(default_factory=list)
+    medications: List[Medication] = Field(default_factory=list)
+    vitals: List[VitalSign] = Field(default_factory=list)
+    labs: List[LabResult] = Field(default_factory=list)
+    plan: List[PlanItem] = Field(default_factory=list)
@@ -0,0 +1,45 @@
+# app/schemas/requests.py
+
+from typing import Optional
+
+from pydantic import BaseModel
+
+from .common import StructuredNote
+
+
+# ---------- Documents ----------
+
+class DocumentCreate(BaseModel):
+    title: str
+    content: str
+
+
+# ---------- Summarization ----------
+
+class SummarizeRequest(BaseModel):
+    note: str
+
+
+# ---------- RAG Question Answering ----------
+
+class QuestionRequest(BaseModel):
+    question: str
+
+
+# ---------- Structured Data Extraction (Part 4) ----------
+
+class ExtractStructuredRequest(BaseModel):
+    note: str
+
+
+# ---------- FHIR Mapping (Part 5) ----------
+
+class ToFhirRequest(BaseModel):
+    structured: StructuredNote
+
+
+# ---------- Full Workflow ----------
+
+class FullWorkflowRequest(BaseModel):
+    note: str
+    question: Optional[str] = None  # for RAG (optional)
@@ -0,0 +1,89 @@
+# app/schemas/responses.py
+
+from pydantic import BaseModel, ConfigDict
+from typing import List, Optional, Any
+
+from .common import StructuredNote
+
+
+# Response models are built once per request and never modified; freezing
+# them and rejecting unknown keys keeps construction strict and cheap.
+_RESPONSE_CONFIG = ConfigDict(extra="forbid", frozen=True)
+
+
+# ---------- Documents ----------
+
+class DocumentRead(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
+    id: int
+    title: str
+    content: Optional[str] = None  # only returned by GET /documents/{id}
+
+
+# ---------- Summarization ----------
+
+class SummarizeResponse(BaseModel):
+    model_config = _RESPONSE_CONFIG
+
+    summary: str
+
+
+# ---------- RAG Question Answering ----------
+
+class AnswerResponse(BaseModel):
+    model_config = _RESPONSE_CONFIG
+
+    answer: str
+    used_documents: List[int]
+
+
+# ---------- Structured Data Extraction (Part 4) ----------
+
+class ExtractStructuredResponse(BaseModel):
+    model_config = _RESPONSE_CONFIG
+
+    structured: StructuredNote
+
+
+class ExtractJobResponse(BaseModel):
+    model_config = _RESPONSE_CONFIG
+
+    job_id: str
+    status: str  # "queued", "submitting", "submitted", "completed" or "failed"
+    structured: Optional[StructuredNote] = None
+    error: Optional[str] = None
+
+
+# ---------- FHIR Mapping (Part 5) ----------
+
+class ToFhirResponse(BaseModel):
+    model_config = _RESPONSE_CONFIG
+
+    # We keep this generic; it's a FHIR-like Bundle or collection of resources.
+    # Typed as Any so the bundle from our own mapper is passed through as-is
+    # instead of being walked and re-validated key by key.
+    fhir: Any
+
+
+# ---------- Token Usage ----------
+
+class TokenUsage(BaseModel):
+    model_config = _RESPONSE_CONFIG
+
+    input_tokens: int = 0
+    cached_input_tokens: int = 0  # part of input_tokens served from the prompt cache
+    output_tokens: int = 0
+    total_tokens: int = 0
+
+
+# ---------- Full Workflow ----------
+
+class FullWorkflowResponse(BaseModel):
+    model_config = _RESPONSE_CONFIG
+
+    summary: str
+    rag_answer: Optional[str] = None
+    structured: StructuredNote
+    fhir: Any  # pass-through bundle, see ToFhirResponse
+    usage: TokenUsage